@@ -1,21 +1,80 @@
+import io
 import json
 import os
 import logging
-from datetime import datetime
-from typing import Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:  # not bundled with this function; fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 REGION = os.environ.get("AWS_REGION", "us-east-1")
 BUCKET = os.environ.get("UPGRADE_BUCKET")  # required
-MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "amazon.titan-text-lite-v1")  # model-agnostic placeholder
-
-s3 = boto3.client("s3", region_name=REGION)
-brt = boto3.client("bedrock-runtime", region_name=REGION)
+MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")  # any Converse-capable model
+BEDROCK_ENABLED = os.environ.get("BEDROCK_ENABLED", "1") == "1"  # "0" while model access is not granted
+
+# Shared client tuning: adaptive retries for Bedrock/S3 throttling, keep-alive for warm reuse.
+# Bedrock generation can run long, S3 reads should fail fast.
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 5},
+    connect_timeout=3,
+    tcp_keepalive=True,
+    max_pool_connections=16,
+)
+S3_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=10))
+BEDROCK_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=60))
+
+# Pool sized for the concurrent candidate-key probes in lambda_handler
+s3 = boto3.client("s3", region_name=REGION, config=S3_CONFIG)
+brt = boto3.client("bedrock-runtime", region_name=REGION, config=BEDROCK_CONFIG)
+
+# "1" only when MODEL_ID is an inference profile served with latency-optimized
+# inference (e.g. us.anthropic.claude-3-5-haiku-...); base model ids do not get it
+LATENCY_OPTIMIZED = os.environ.get("BEDROCK_LATENCY_OPTIMIZED", "0") == "1"
+PERFORMANCE_CONFIG = {"latency": "optimized" if LATENCY_OPTIMIZED else "standard"}
+
+# Fixed reviewer instructions, sent ahead of the per-run DATA block
+STATIC_INSTRUCTIONS = (
+    "You are an enterprise Oracle DBA upgrade reviewer.\n"
+    "Generate a concise report with:\n"
+    "1) Executive summary (non-technical)\n"
+    "2) Technical summary (what happened, key checks)\n"
+    "3) Risks / impact (enterprise perspective)\n"
+    "4) Root cause (based only on provided data)\n"
+    "5) Recommended next steps and preventive controls\n"
+    "6) 5-7 sentence LinkedIn portfolio narrative\n\n"
+    "IMPORTANT: Do not invent facts. Only use provided data.\n"
+)
+
+# Converse rejects a system block for these families (Titan Text among them);
+# they get the instructions at the top of the user message instead
+NO_SYSTEM_PROMPT_PREFIXES = (
+    "amazon.titan-text",
+    "cohere.command-text",
+    "cohere.command-light-text",
+    "mistral.mistral-7b-instruct",
+    "mistral.mixtral-8x7b-instruct",
+)
+
+
+def base_model_id(model_id: str) -> str:
+    """Drop a cross-region inference profile prefix, e.g. "us.amazon.nova-lite-v1:0"."""
+    geo, _, rest = model_id.partition(".")
+    return rest if geo in ("us", "eu", "apac", "global") else model_id
+
+
+SYSTEM_PROMPT_SUPPORTED = not base_model_id(MODEL_ID).startswith(NO_SYSTEM_PROMPT_PREFIXES)
 
 
 # ----------------------------
@@ -24,18 +83,53 @@ brt = boto3.client("bedrock-runtime", region_name=REGION)
 def s3_get_json(bucket: str, key: str) -> Optional[dict]:
     try:
         obj = s3.get_object(Bucket=bucket, Key=key)
-        return json.loads(obj["Body"].read())
+        raw = obj["Body"].read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
     except ClientError as e:
         if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
             return None
         raise
 
 
-def s3_put_text(bucket: str, key: str, text: str) -> None:
+def first_json_hit(keys: List[str], futures: List[Future]) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Returns (document, key) for the first candidate in priority order that exists.
+    """
+    for k, fut in zip(keys, futures):
+        doc = fut.result()
+        if doc:
+            return doc, k
+    return None, None
+
+
+def json_compact(data) -> str:
+    """
+    Compact JSON (no indent/whitespace) for payloads that are sent, not read by humans.
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"))
+
+
+# Reports above this size are uploaded as parallel multipart parts
+REPORT_TRANSFER_CONFIG = TransferConfig(multipart_threshold=1 << 20, max_concurrency=4)
+
+
+def s3_put_text(bucket: str, key: str, body: bytearray) -> None:
+    """
+    Uploads an already UTF-8 encoded markdown body (botocore accepts the buffer as-is).
+    """
+    if len(body) > REPORT_TRANSFER_CONFIG.multipart_threshold:
+        s3.upload_fileobj(
+            io.BytesIO(body), bucket, key,
+            ExtraArgs={"ContentType": "text/markdown"},
+            Config=REPORT_TRANSFER_CONFIG,
+        )
+        return
     s3.put_object(
         Bucket=bucket,
         Key=key,
-        Body=text.encode("utf-8"),
+        Body=body,
         ContentType="text/markdown",
     )
 
@@ -55,45 +149,58 @@ def extract_run_id_from_key(key: str) -> Optional[str]:
     return None
 
 
+# Prompt-only trimming: the LLM needs signals, not S3 paths or boilerplate notes
+PROMPT_DROP_KEYS = ("notes", "paths")
+PROMPT_LIST_CAPS = {"invalid_objects_sample": 20, "ora_errors_sample": 15}
+
+
+def _slim_metrics(m: dict) -> dict:
+    slim = {k: v for k, v in m.items() if k not in PROMPT_DROP_KEYS}
+    sig = slim.get("signals")
+    if isinstance(sig, dict):
+        slim["signals"] = {
+            k: v[: PROMPT_LIST_CAPS[k]] if k in PROMPT_LIST_CAPS and isinstance(v, list) else v
+            for k, v in sig.items()
+        }
+    return slim
+
+
 def build_prompt(metrics: dict, sanitized: Optional[dict], s3_key_triggered: str) -> str:
     # Keep prompt compact and structured
     context = {
         "s3_key_triggered": s3_key_triggered,
-        "metrics": metrics,
+        "metrics": _slim_metrics(metrics),
     }
     if sanitized:
         context["sanitized_summary"] = sanitized
 
-    return (
-        "You are an enterprise Oracle DBA upgrade reviewer.\n"
-        "Generate a concise report with:\n"
-        "1) Executive summary (non-technical)\n"
-        "2) Technical summary (what happened, key checks)\n"
-        "3) Risks / impact (enterprise perspective)\n"
-        "4) Root cause (based only on provided data)\n"
-        "5) Recommended next steps and preventive controls\n"
-        "6) 5-7 sentence LinkedIn portfolio narrative\n\n"
-        "IMPORTANT: Do not invent facts. Only use provided data.\n\n"
-        f"DATA:\n{json.dumps(context, indent=2)}\n"
-    )
+    # Only the dynamic data; call_bedrock places STATIC_INSTRUCTIONS per model
+    return f"DATA:\n{json_compact(context)}\n"
 
 
 def call_bedrock(prompt: str) -> str:
     """
-    Titan-style request body. If you swap models later, adjust here only.
+    Converse API request. The static instructions go in the system prompt when the
+    model accepts one, otherwise they lead the user message.
     """
-    body = {"inputText": prompt}
-    resp = brt.invoke_model(
+    if SYSTEM_PROMPT_SUPPORTED:
+        extra = {"system": [{"text": STATIC_INSTRUCTIONS}]}
+    else:
+        extra = {}
+        prompt = STATIC_INSTRUCTIONS + "\n" + prompt
+    resp = brt.converse(
         modelId=MODEL_ID,
-        body=json.dumps(body),
-        contentType="application/json",
-        accept="application/json",
+        messages=[{"role": "user", "content": [{"text": prompt}]}],
+        inferenceConfig={"maxTokens": 1800, "temperature": 0.2},
+        performanceConfig=PERFORMANCE_CONFIG,
+        **extra,
     )
-    payload = json.loads(resp["body"].read())
+    usage = resp.get("usage", {})
+    logger.info("Bedrock usage: input=%s output=%s", usage.get("inputTokens"), usage.get("outputTokens"))
 
-    # Titan response format
-    text = payload.get("results", [{}])[0].get("outputText", "")
-    return (text or "").strip()
+    blocks = resp.get("output", {}).get("message", {}).get("content", [])
+    text = "".join(b.get("text", "") for b in blocks)
+    return text.strip()
 
 
 def deterministic_fallback(metrics: dict, sanitized: Optional[dict]) -> str:
@@ -162,13 +269,12 @@ def get_bucket_and_key_from_event(event: dict) -> Tuple[Optional[str], Optional[
       - Manual invocation with {"bucket": "...", "key": "..."} or {"run_id":"..."}
     """
     # S3 event
-    records = event.get("Records")
-    if isinstance(records, list) and records:
-        r0 = records[0]
-        if r0.get("eventSource") == "aws:s3":
-            b = r0.get("s3", {}).get("bucket", {}).get("name")
-            k = r0.get("s3", {}).get("object", {}).get("key")
-            return b, k
+    try:
+        r0 = event["Records"][0]
+        if r0["eventSource"] == "aws:s3":
+            return r0["s3"]["bucket"]["name"], r0["s3"]["object"]["key"]
+    except (KeyError, IndexError, TypeError):
+        pass
 
     # Manual bucket/key
     if "bucket" in event and "key" in event:
@@ -204,14 +310,18 @@ def lambda_handler(event, context):
         f"{run_id}/metrics.json",
     ]
 
-    metrics = None
-    used_metrics_key = None
-    for k in candidate_metrics_keys:
-        metrics = s3_get_json(BUCKET, k)
-        if metrics:
-            used_metrics_key = k
-            break
+    # Optional sanitized summary (you already have sanitized_summary.json locally; if you upload it per run, we’ll read it)
+    candidate_sanitized_keys = [
+        f"runs/{run_id}/sanitized_summary.json",
+        f"runs/{run_id}/sanitized/sanitized_summary.json",
+    ]
+
+    # Probe every candidate concurrently; a miss costs one round-trip, so wall time is max() not sum()
+    with ThreadPoolExecutor(max_workers=len(candidate_metrics_keys) + len(candidate_sanitized_keys)) as pool:
+        metrics_futures = [pool.submit(s3_get_json, BUCKET, k) for k in candidate_metrics_keys]
+        sanitized_futures = [pool.submit(s3_get_json, BUCKET, k) for k in candidate_sanitized_keys]
 
+    metrics, used_metrics_key = first_json_hit(candidate_metrics_keys, metrics_futures)
     if not metrics:
         return {
             "status": "error",
@@ -219,38 +329,39 @@ def lambda_handler(event, context):
             "message": f"metrics.json not found. Tried: {candidate_metrics_keys}",
         }
 
-    # Optional sanitized summary (you already have sanitized_summary.json locally; if you upload it per run, we’ll read it)
-    candidate_sanitized_keys = [
-        f"runs/{run_id}/sanitized_summary.json",
-        f"runs/{run_id}/sanitized/sanitized_summary.json",
-    ]
-    sanitized = None
-    for k in candidate_sanitized_keys:
-        sanitized = s3_get_json(BUCKET, k)
-        if sanitized:
-            break
+    # Resolved only once metrics exist, so a failed optional probe cannot mask the miss above
+    sanitized, _ = first_json_hit(candidate_sanitized_keys, sanitized_futures)
 
     # Generate report
+    generated_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
     header = (
         f"# Oracle Upgrade / Migration Report\n"
         f"**Run ID:** {run_id}\n"
-        f"**Generated (UTC):** {datetime.utcnow().isoformat()}Z\n"
+        f"**Generated (UTC):** {generated_utc}\n"
         f"**Metrics Source:** s3://{BUCKET}/{used_metrics_key}\n"
         + (f"**Trigger Object:** s3://{event_bucket}/{event_key}\n" if event_bucket and event_key else "")
         + "\n---\n"
     )
 
     engine = "fallback"
-    try:
-        prompt = build_prompt(metrics, sanitized, event_key or "")
-        body_text = call_bedrock(prompt)
-        report_body = body_text if body_text else "Bedrock returned empty output."
-        engine = f"bedrock:{MODEL_ID}"
-    except Exception as e:
-        logger.error("Bedrock invoke failed: %s", str(e))
-        report_body = deterministic_fallback(metrics, sanitized) + f"\n\n---\n**Bedrock error:** {str(e)}\n"
-
-    final_report = header + report_body + "\n"
+    if not BEDROCK_ENABLED:
+        # Known-unauthorized account: skip the doomed invoke entirely
+        engine = "fallback:disabled"
+        report_body = deterministic_fallback(metrics, sanitized)
+    else:
+        try:
+            prompt = build_prompt(metrics, sanitized, event_key or "")
+            body_text = call_bedrock(prompt)
+            report_body = body_text if body_text else "Bedrock returned empty output."
+            engine = f"bedrock:{MODEL_ID}"
+        except Exception as e:
+            logger.error("Bedrock invoke failed: %s", str(e))
+            report_body = deterministic_fallback(metrics, sanitized) + f"\n\n---\n**Bedrock error:** {str(e)}\n"
+
+    # Encode straight into one buffer instead of concatenating str and then encoding
+    final_report = bytearray(header.encode("utf-8"))
+    final_report += report_body.encode("utf-8")
+    final_report += b"\n"
 
     # Write report back to S3 under the same run
     report_key = f"runs/{run_id}/executive_report.md"
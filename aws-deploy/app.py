@@ -1,8 +1,14 @@
 import json
 import boto3
+from botocore.config import Config
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ----------------------------
 # Configuration
@@ -11,8 +17,20 @@ REGION = os.environ.get("AWS_REGION", "us-east-1")
 MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "amazon.titan-text-lite-v1")
 BUCKET = os.environ.get("UPGRADE_BUCKET")
 
-s3 = boto3.client("s3", region_name=REGION)
-bedrock = boto3.client("bedrock-runtime", region_name=REGION)
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 5},
+    connect_timeout=3,
+    tcp_keepalive=True,
+    max_pool_connections=16,
+)
+S3_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=10))
+BEDROCK_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=60))
+
+s3 = boto3.client("s3", region_name=REGION, config=S3_CONFIG)
+bedrock = boto3.client("bedrock-runtime", region_name=REGION, config=BEDROCK_CONFIG)
+
+# Set to "1" only alongside a MODEL_ID that supports latency-optimized inference
+PERFORMANCE_LATENCY = "optimized" if os.environ.get("BEDROCK_LATENCY_OPTIMIZED", "0") == "1" else "standard"
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -30,9 +48,10 @@ def call_bedrock(prompt_text):
     try:
         response = bedrock.invoke_model(
             modelId=MODEL_ID,
-            body=json.dumps(body),
+            body=orjson.dumps(body) if orjson is not None else json.dumps(body).encode("utf-8"),
             contentType="application/json",
-            accept="application/json"
+            accept="application/json",
+            performanceConfigLatency=PERFORMANCE_LATENCY
         )
 
         response_body = json.loads(response["body"].read())
@@ -55,9 +74,7 @@ AI layer is model-agnostic and will function once model access is enabled.
 # ----------------------------
 # Report Builder
 # ----------------------------
-def build_prompt(summary_json):
-
-    return f"""
+PROMPT_PREFIX = """
 You are an enterprise Oracle Database upgrade reviewer.
 
 Generate:
@@ -70,10 +87,15 @@ Generate:
 6. LinkedIn Portfolio Narrative (short)
 
 Upgrade Summary:
-{json.dumps(summary_json, indent=2)}
 """
 
 
+def build_prompt(summary_json):
+
+    # Static instructions are a module constant; only the summary is serialized per call
+    return PROMPT_PREFIX + json.dumps(summary_json, indent=2) + "\n"
+
+
 # ----------------------------
 # Lambda Handler
 # ----------------------------
@@ -89,7 +111,8 @@ def lambda_handler(event, context):
         metrics_key = f"runs/{run_id}/metrics/metrics.json"
 
         response = s3.get_object(Bucket=BUCKET, Key=metrics_key)
-        metrics_data = json.loads(response["Body"].read())
+        raw = response["Body"].read()
+        metrics_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
         logger.info("metrics.json loaded successfully")
 
@@ -101,17 +124,19 @@ def lambda_handler(event, context):
 
     ai_report = call_bedrock(prompt)
 
-    timestamp = datetime.utcnow().isoformat()
+    timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
-    final_report = f"""
+    header = f"""
 # Oracle Upgrade AI Report
 Run ID: {run_id}
 Generated: {timestamp}
 
 ---
 
-{ai_report}
 """
+    final_report = bytearray(header.encode("utf-8"))
+    final_report += ai_report.encode("utf-8")
+    final_report += b"\n"
 
     report_key = f"runs/{run_id}/reports/ai_report.md"
 
@@ -119,7 +144,7 @@ Generated: {timestamp}
         s3.put_object(
             Bucket=BUCKET,
             Key=report_key,
-            Body=final_report.encode("utf-8"),
+            Body=final_report,
             ContentType="text/markdown"
         )
 
@@ -1,27 +1,95 @@
-﻿import json
+﻿import io
+import json
 import os
 import re
 import logging
-from datetime import datetime
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Tuple, List
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:  # not bundled with this function; fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 REGION = os.environ.get("AWS_REGION", "us-east-1")
 BUCKET = os.environ.get("BUCKET_NAME")
-DEFAULT_MODEL_ID = os.environ.get("DEFAULT_MODEL_ID", "amazon.titan-text-lite-v1")
-
-s3 = boto3.client("s3", region_name=REGION)
-brt = boto3.client("bedrock-runtime", region_name=REGION)
+DEFAULT_MODEL_ID = os.environ.get("DEFAULT_MODEL_ID", "amazon.nova-lite-v1:0")
+# Opt-in: filter log lines server-side with S3 Select (only for accounts that still have it)
+S3_SELECT_LOGS = os.environ.get("S3_SELECT_LOGS", "0") == "1"
+
+# Adaptive retries + keep-alive for both clients; only the read timeout differs
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 5},
+    connect_timeout=3,
+    tcp_keepalive=True,
+    max_pool_connections=16,
+)
+S3_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=10))
+BEDROCK_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=60))
+REPORT_TRANSFER_CONFIG = TransferConfig(multipart_threshold=1 << 20, max_concurrency=4)
+
+# Pool sized for the concurrent artifact reads in build_metrics
+s3 = boto3.client("s3", region_name=REGION, config=S3_CONFIG)
+brt = boto3.client("bedrock-runtime", region_name=REGION, config=BEDROCK_CONFIG)
+
+# Opt-in: latency-optimized inference is only served through a few cross-region
+# profiles, so the deployer who picks DEFAULT_MODEL_ID turns it on
+LATENCY_OPTIMIZED = os.environ.get("BEDROCK_LATENCY_OPTIMIZED", "0") == "1"
+PERFORMANCE_CONFIG = {"latency": "optimized" if LATENCY_OPTIMIZED else "standard"}
+
+# Reviewer instructions; the system prompt where the model takes one (see call_bedrock)
+STATIC_INSTRUCTIONS = (
+    "You are an enterprise Oracle DBA upgrade reviewer.\n"
+    "Write a report with:\n"
+    "1) Executive summary\n"
+    "2) Technical validation summary\n"
+    "3) Risks/impact\n"
+    "4) Root cause hypothesis (based ONLY on provided errors/signals)\n"
+    "5) Remediation + preventive controls\n"
+    "6) LinkedIn portfolio narrative (5-7 sentences)\n\n"
+    "Do not invent facts.\n"
+)
+
+# Model families whose Converse API refuses a system block, e.g. the stack's
+# default amazon.titan-text-lite-v1 (samconfig DefaultBedrockModelId)
+NO_SYSTEM_PROMPT_PREFIXES = (
+    "amazon.titan-text",
+    "cohere.command-text",
+    "cohere.command-light-text",
+    "mistral.mistral-7b-instruct",
+    "mistral.mixtral-8x7b-instruct",
+)
+
+def _supports_system_prompt(model_id: str) -> bool:
+    # strip a cross-region inference profile prefix ("us.", "eu.", ...) first
+    head, _, rest = model_id.partition(".")
+    base = rest if head in ("us", "eu", "apac", "global") else model_id
+    return not base.startswith(NO_SYSTEM_PROMPT_PREFIXES)
+
+SYSTEM_PROMPT_SUPPORTED = _supports_system_prompt(DEFAULT_MODEL_ID)
 
 
 # --------------------------
 # S3 helpers
 # --------------------------
+def json_compact(data) -> str:
+    """
+    Compact JSON (no indent/whitespace) for payloads that are sent, not read by humans.
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"))
+
 def s3_get_text(bucket: str, key: str) -> Optional[str]:
     try:
         obj = s3.get_object(Bucket=bucket, Key=key)
@@ -32,32 +100,76 @@ def s3_get_text(bucket: str, key: str) -> Optional[str]:
             return None
         raise
 
+# Each log line is one CSV record with a single column; NUL never occurs in the logs,
+# so using it as field delimiter and quote character passes lines through verbatim.
+S3_SELECT_LINE_CSV = {"RecordDelimiter": "\n", "FieldDelimiter": "\x00", "QuoteCharacter": "\x00"}
+
+def s3_select_ora_lines(bucket: str, key: str) -> Iterator[bytes]:
+    resp = s3.select_object_content(
+        Bucket=bucket,
+        Key=key,
+        ExpressionType="SQL",
+        Expression="SELECT s._1 FROM S3Object s WHERE s._1 LIKE '%ORA-%'",
+        InputSerialization={"CSV": {**S3_SELECT_LINE_CSV, "FileHeaderInfo": "NONE"}, "CompressionType": "NONE"},
+        OutputSerialization={"CSV": S3_SELECT_LINE_CSV},
+    )
+    stream = resp["Payload"]
+    try:
+        pending = b""
+        for event in stream:
+            if "Records" in event:
+                # Payload chunks are not line-aligned; carry the partial tail over
+                lines = (pending + event["Records"]["Payload"]).split(b"\n")
+                pending = lines.pop()
+                yield from lines
+        if pending:
+            yield pending
+    finally:
+        stream.close()
+
+def s3_scan_ora_errors(bucket: str, key: str) -> List[str]:
+    if S3_SELECT_LOGS:
+        try:
+            return extract_ora_errors_from_log(s3_select_ora_lines(bucket, key))
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404"):
+                return []
+            logger.warning("S3 Select failed for %s (%s); falling back to streamed GET", key, code)
+
+    # Logs can be multi-MB: scan the body line by line instead of decoding it whole
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code in ("NoSuchKey", "404"):
+            return []
+        raise
+    body = obj["Body"]
+    try:
+        return extract_ora_errors_from_log(body.iter_lines())
+    finally:
+        body.close()
+
 def s3_put_json(bucket: str, key: str, data: dict) -> None:
     s3.put_object(
         Bucket=bucket,
         Key=key,
-        Body=json.dumps(data, indent=2).encode("utf-8"),
+        Body=json_compact(data).encode("utf-8"),
         ContentType="application/json",
     )
 
-def s3_put_md(bucket: str, key: str, text: str) -> None:
-    s3.put_object(Bucket=bucket, Key=key, Body=text.encode("utf-8"), ContentType="text/markdown")
-
-def s3_list_keys(bucket: str, prefix: str) -> List[str]:
-    keys = []
-    token = None
-    while True:
-        kwargs = {"Bucket": bucket, "Prefix": prefix}
-        if token:
-            kwargs["ContinuationToken"] = token
-        resp = s3.list_objects_v2(**kwargs)
-        for item in resp.get("Contents", []):
-            keys.append(item["Key"])
-        if resp.get("IsTruncated"):
-            token = resp.get("NextContinuationToken")
-        else:
-            break
-    return keys
+def s3_put_md(bucket: str, key: str, body: bytearray) -> None:
+    # Large reports go through the transfer manager for parallel multipart parts
+    if len(body) > REPORT_TRANSFER_CONFIG.multipart_threshold:
+        s3.upload_fileobj(io.BytesIO(body), bucket, key, ExtraArgs={"ContentType": "text/markdown"}, Config=REPORT_TRANSFER_CONFIG)
+        return
+    s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType="text/markdown")
+
+def s3_find_log_key(bucket: str, prefix: str) -> Optional[str]:
+    # Prefix is scoped to the log family (e.g. ".../03-migration/impdp"), so one small page is enough
+    resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix, MaxKeys=10)
+    return next((item["Key"] for item in resp.get("Contents", []) if item["Key"].endswith(".log")), None)
 
 
 # --------------------------
@@ -70,13 +182,12 @@ def extract_run_id_from_key(key: str) -> Optional[str]:
     return None
 
 def get_bucket_key_from_event(event: dict) -> Tuple[Optional[str], Optional[str]]:
-    recs = event.get("Records")
-    if isinstance(recs, list) and recs:
-        r0 = recs[0]
-        if r0.get("eventSource") == "aws:s3":
-            b = r0.get("s3", {}).get("bucket", {}).get("name")
-            k = r0.get("s3", {}).get("object", {}).get("key")
-            return b, k
+    try:
+        r0 = event["Records"][0]
+        if r0["eventSource"] == "aws:s3":
+            return r0["s3"]["bucket"]["name"], r0["s3"]["object"]["key"]
+    except (KeyError, IndexError, TypeError):
+        pass
     if "bucket" in event and "key" in event:
         return event["bucket"], event["key"]
     return None, None
@@ -85,6 +196,11 @@ def get_bucket_key_from_event(event: dict) -> Tuple[Optional[str], Optional[str]
 # --------------------------
 # Parsers (deterministic)
 # --------------------------
+# Line-anchored so a whole-buffer findall still yields the first OWNER.OBJECT per line
+OBJ_NAME_RE = re.compile(r"^[^\n]*?([A-Z0-9_]+)\.([A-Z0-9_]+)", re.MULTILINE)
+ORA_LINE_RE = re.compile(r"^[^\n]*ORA-[^\n]*", re.MULTILINE)
+INTEGER_RE = re.compile(r"\b\d+\b")
+
 def parse_invalid_object_proof(txt: Optional[str]) -> dict:
     """
     Your invalid_object_proof.txt is a proof artifact. We extract:
@@ -93,90 +209,89 @@ def parse_invalid_object_proof(txt: Optional[str]) -> dict:
     """
     if not txt:
         return {"invalid_objects": [], "ora_errors": []}
-    invalids = []
-    ora = []
-    for line in txt.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if "ORA-" in line:
-            ora.append(line)
-        # detect object-like patterns OWNER.OBJECT or just VIEW name
-        m = re.search(r"([A-Z0-9_]+)\.([A-Z0-9_]+)", line.upper())
-        if m:
-            invalids.append(f"{m.group(1)}.{m.group(2)}")
-    # unique
-    invalids = list(dict.fromkeys(invalids))
-    ora = list(dict.fromkeys(ora))
+    # detect object-like patterns OWNER.OBJECT or just VIEW name; one scan over the whole buffer
+    invalids = list(dict.fromkeys(f"{owner}.{name}" for owner, name in OBJ_NAME_RE.findall(txt.upper())))
+    ora = list(dict.fromkeys(m.group(0).strip() for m in ORA_LINE_RE.finditer(txt)))
     return {"invalid_objects": invalids[:50], "ora_errors": ora[:25]}
 
 def parse_orders_count_proof(txt: Optional[str]) -> Optional[int]:
     if not txt:
         return None
     # extract last integer in file
-    nums = re.findall(r"\b\d+\b", txt)
+    nums = INTEGER_RE.findall(txt)
     return int(nums[-1]) if nums else None
 
-def extract_ora_errors_from_log(txt: Optional[str]) -> List[str]:
-    if not txt:
+def extract_ora_errors_from_log(lines: Optional[Iterable[bytes]]) -> List[str]:
+    if lines is None:
         return []
-    errs = []
-    for line in txt.splitlines():
-        if "ORA-" in line:
-            errs.append(line.strip())
-    # unique
     out = []
     seen = set()
-    for e in errs:
-        if e not in seen:
-            out.append(e)
-            seen.add(e)
-    return out[:50]
+    for line in lines:
+        # byte-level check first so lines without hits are never decoded
+        if b"ORA-" not in line:
+            continue
+        e = line.strip().decode("utf-8", errors="ignore")
+        if e in seen:
+            continue
+        seen.add(e)
+        out.append(e)
+        if len(out) >= 50:
+            break
+    return out
 
 
-def build_metrics(run_id: str) -> dict:
+def build_metrics(run_id: str, generated_utc: str) -> dict:
     base = f"runs/{run_id}/"
 
-    invalid_txt = s3_get_text(BUCKET, base + "04-validation/invalid_object_proof.txt")
-    orders_txt = s3_get_text(BUCKET, base + "04-validation/orders_count_proof.txt")
-    validation_log = s3_get_text(BUCKET, base + "04-validation/validation_23c.log")
-
-    # find expdp/impdp logs dynamically
-    keys = s3_list_keys(BUCKET, base + "03-migration/")
-    expdp_log_key = next((k for k in keys if k.endswith(".log") and "expdp" in k.lower()), None)
-    impdp_log_key = next((k for k in keys if k.endswith(".log") and "impdp" in k.lower()), None)
+    paths = {
+        "invalid_object_proof": base + "04-validation/invalid_object_proof.txt",
+        "orders_count_proof": base + "04-validation/orders_count_proof.txt",
+        "validation_log": base + "04-validation/validation_23c.log",
+    }
 
-    expdp_log = s3_get_text(BUCKET, expdp_log_key) if expdp_log_key else None
-    impdp_log = s3_get_text(BUCKET, impdp_log_key) if impdp_log_key else None
+    # Fan out every artifact read: the fixed keys and the two log LISTs go out together,
+    # then the resolved expdp/impdp logs are scanned while the fixed reads finish.
+    # Proof files are small and read whole; logs are streamed straight into the ORA scan.
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        invalid_fut = pool.submit(s3_get_text, BUCKET, paths["invalid_object_proof"])
+        orders_fut = pool.submit(s3_get_text, BUCKET, paths["orders_count_proof"])
+        log_errors = {"validation_log": pool.submit(s3_scan_ora_errors, BUCKET, paths["validation_log"])}
+        expdp_fut = pool.submit(s3_find_log_key, BUCKET, base + "03-migration/expdp")
+        impdp_fut = pool.submit(s3_find_log_key, BUCKET, base + "03-migration/impdp")
+
+        paths["expdp_log"] = expdp_fut.result()
+        paths["impdp_log"] = impdp_fut.result()
+        for name in ("expdp_log", "impdp_log"):
+            if paths[name]:
+                log_errors[name] = pool.submit(s3_scan_ora_errors, BUCKET, paths[name])
+
+    invalid_txt = invalid_fut.result()
+    orders_txt = orders_fut.result()
 
     inv = parse_invalid_object_proof(invalid_txt)
     orders = parse_orders_count_proof(orders_txt)
 
-    ora_errors = []
-    ora_errors += inv.get("ora_errors", [])
-    ora_errors += extract_ora_errors_from_log(validation_log)
-    ora_errors += extract_ora_errors_from_log(expdp_log)
-    ora_errors += extract_ora_errors_from_log(impdp_log)
+    ora_sources = [inv.get("ora_errors", [])]
+    for name in ("validation_log", "expdp_log", "impdp_log"):
+        if name in log_errors:
+            ora_sources.append(log_errors[name].result())
 
-    # unique
+    # unique across sources in one pass; only the first 25 are reported
     uniq = []
     seen = set()
-    for e in ora_errors:
-        if e not in seen:
-            uniq.append(e)
-            seen.add(e)
+    for e in chain.from_iterable(ora_sources):
+        if e in seen:
+            continue
+        seen.add(e)
+        uniq.append(e)
+        if len(uniq) >= 25:
+            break
 
     metrics = {
         "run_id": run_id,
-        "generated_utc": datetime.utcnow().isoformat() + "Z",
+        "generated_utc": generated_utc,
         "bucket": BUCKET,
-        "paths": {
-            "invalid_object_proof": base + "04-validation/invalid_object_proof.txt",
-            "orders_count_proof": base + "04-validation/orders_count_proof.txt",
-            "validation_log": base + "04-validation/validation_23c.log",
-            "expdp_log": expdp_log_key,
-            "impdp_log": impdp_log_key,
-        },
+        "paths": paths,
         "upgrade": {
             "source": "Oracle 18c (Docker)",
             "target": "Oracle 23c/23ai (Docker)",
@@ -186,7 +301,7 @@ def build_metrics(run_id: str) -> dict:
             "invalid_objects_detected": len(inv.get("invalid_objects", [])),
             "invalid_objects_sample": inv.get("invalid_objects", []),
             "orders_count": orders,
-            "ora_errors_sample": uniq[:25],
+            "ora_errors_sample": uniq,
         },
         "notes": [
             "metrics.json was generated deterministically from S3 artifacts.",
@@ -200,30 +315,40 @@ def build_metrics(run_id: str) -> dict:
 # Bedrock
 # --------------------------
 def call_bedrock(prompt: str) -> str:
-    body = {"inputText": prompt}
-    resp = brt.invoke_model(
+    if SYSTEM_PROMPT_SUPPORTED:
+        extra = {"system": [{"text": STATIC_INSTRUCTIONS}]}
+    else:
+        extra = {}
+        prompt = STATIC_INSTRUCTIONS + "\n" + prompt
+    resp = brt.converse(
         modelId=DEFAULT_MODEL_ID,
-        body=json.dumps(body),
-        contentType="application/json",
-        accept="application/json",
+        messages=[{"role": "user", "content": [{"text": prompt}]}],
+        inferenceConfig={"maxTokens": 1800, "temperature": 0.2},
+        performanceConfig=PERFORMANCE_CONFIG,
+        **extra,
     )
-    payload = json.loads(resp["body"].read())
-    text = payload.get("results", [{}])[0].get("outputText", "")
-    return (text or "").strip()
+    usage = resp.get("usage", {})
+    logger.info("Bedrock usage: input=%s output=%s", usage.get("inputTokens"), usage.get("outputTokens"))
+    blocks = resp.get("output", {}).get("message", {}).get("content", [])
+    text = "".join(b.get("text", "") for b in blocks)
+    return text.strip()
+
+# Prompt-only trimming: the LLM needs signals, not S3 paths or boilerplate notes
+PROMPT_DROP_KEYS = ("notes", "paths")
+PROMPT_LIST_CAPS = {"invalid_objects_sample": 20, "ora_errors_sample": 15}
+
+def _slim_metrics(m: dict) -> dict:
+    slim = {k: v for k, v in m.items() if k not in PROMPT_DROP_KEYS}
+    sig = slim.get("signals")
+    if isinstance(sig, dict):
+        slim["signals"] = {
+            k: v[: PROMPT_LIST_CAPS[k]] if k in PROMPT_LIST_CAPS and isinstance(v, list) else v
+            for k, v in sig.items()
+        }
+    return slim
 
 def build_prompt(metrics: dict) -> str:
-    return (
-        "You are an enterprise Oracle DBA upgrade reviewer.\n"
-        "Write a report with:\n"
-        "1) Executive summary\n"
-        "2) Technical validation summary\n"
-        "3) Risks/impact\n"
-        "4) Root cause hypothesis (based ONLY on provided errors/signals)\n"
-        "5) Remediation + preventive controls\n"
-        "6) LinkedIn portfolio narrative (5-7 sentences)\n\n"
-        "Do not invent facts.\n\n"
-        f"DATA:\n{json.dumps(metrics, indent=2)}\n"
-    )
+    return f"DATA:\n{json_compact(_slim_metrics(metrics))}\n"
 
 def fallback_report(metrics: dict, bedrock_error: str) -> str:
     sig = metrics.get("signals", {})
@@ -278,7 +403,9 @@ def handler(event, context):
     if not run_id:
         return {"status": "error", "message": "Could not determine run_id"}
 
-    metrics = build_metrics(run_id)
+    # One timestamp per invocation so metrics.json and the report header agree
+    generated_utc = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    metrics = build_metrics(run_id, generated_utc)
 
     # Write metrics where your structure expects genai artifacts
     metrics_key = f"runs/{run_id}/07-genai/metrics.json"
@@ -290,7 +417,7 @@ def handler(event, context):
     header = (
         f"# Oracle Upgrade / Migration Executive Report\n"
         f"**Run ID:** {run_id}\n"
-        f"**Generated (UTC):** {datetime.utcnow().isoformat()}Z\n"
+        f"**Generated (UTC):** {generated_utc}\n"
         + (f"**Trigger:** s3://{trig_bucket}/{trig_key}\n" if trig_bucket and trig_key else "")
         + f"**Metrics:** s3://{BUCKET}/{metrics_key}\n\n---\n"
     )
@@ -305,7 +432,9 @@ def handler(event, context):
     except Exception as e:
         body = fallback_report(metrics, str(e))
 
-    final = header + body + "\n"
+    final = bytearray(header.encode("utf-8"))
+    final += body.encode("utf-8")
+    final += b"\n"
     s3_put_md(BUCKET, report_key, final)
 
     return {"status": "success", "run_id": run_id, "engine": engine, "report_s3": f"s3://{BUCKET}/{report_key}", "metrics_s3": f"s3://{BUCKET}/{metrics_key}"}
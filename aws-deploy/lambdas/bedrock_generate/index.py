@@ -2,17 +2,34 @@
 import os
 from pathlib import Path
 import boto3
+from botocore.config import Config
 
-s3 = boto3.client("s3")
-brt = boto3.client("bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-1"))
+# Adaptive retries absorb Bedrock throttling when the parallel branches run together
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 5},
+    connect_timeout=3,
+    tcp_keepalive=True,
+    max_pool_connections=16,
+)
+S3_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=10))
+BEDROCK_CONFIG = CLIENT_CONFIG.merge(Config(read_timeout=60))
+
+s3 = boto3.client("s3", config=S3_CONFIG)
+brt = boto3.client("bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-1"), config=BEDROCK_CONFIG)
 
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 
+# Read once per container; warm invocations reuse the cached templates
+PROMPTS = {
+    p.name[: -len(".prompt.txt")]: p.read_text(encoding="utf-8")
+    for p in PROMPTS_DIR.glob("*.prompt.txt")
+}
+
 def load_prompt(name: str) -> str:
-    p = PROMPTS_DIR / f"{name}.prompt.txt"
-    if not p.exists():
-        raise ValueError(f"Missing prompt: {p}")
-    return p.read_text(encoding="utf-8")
+    try:
+        return PROMPTS[name]
+    except KeyError:
+        raise ValueError(f"Missing prompt: {PROMPTS_DIR / f'{name}.prompt.txt'}") from None
 
 def invoke_anthropic(model_id: str, user_text: str) -> str:
     body = {
@@ -23,15 +23,25 @@
 #   - Allowlisted parsing only
 #   - Writes only summaries/excerpts back to S3
 
+import codecs
+import io
 import json
 import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import unquote_plus
 
 import boto3
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:  # stdlib json keeps the function working without the package
+    orjson = None
+
 s3 = boto3.client("s3")
 
 # --------------------------
@@ -42,6 +52,13 @@ MAX_BYTES_METRICS = 800_000
 MAX_BYTES_LOG = 600_000
 MAX_BYTES_PROOF = 120_000
 
+# Of MAX_BYTES_LOG, how much is taken from the end of an oversized log: Data Pump
+# writes its completion marker and final error summary there
+LOG_TAIL_BYTES = 64_000
+
+# S3 GETs/LIST issued concurrently per run (boto3 clients are thread-safe)
+MAX_FETCH_WORKERS = 8
+
 ALLOWLIST_RELATIVE_KEYS = [
     "02-precheck/precheck.log",
     "03-migration/expdp_legacy_18c.log",
@@ -57,24 +74,36 @@ ORDERS_COUNT_PROOF_REL = "04-validation/orders_count_proof.txt"
 # Regex patterns
 # --------------------------
 
-ORA_RE = re.compile(r"\b(ORA-\d{5})\b", re.IGNORECASE)
-
-DP_SUCCESS_RE = re.compile(r"\bsuccessfully completed\b", re.IGNORECASE)
-DP_COMPLETED_WITH_ERRORS_RE = re.compile(r"\bcompleted with\s+(\d+)\s+error", re.IGNORECASE)
-DP_COMPLETED_WITH_ERRORS_RE2 = re.compile(r"\bcompleted with\s+error", re.IGNORECASE)
-DP_COMPLETED_RE = re.compile(r"\bcompleted\b", re.IGNORECASE)
-
-IMPDP_RETRY_RE = re.compile(r"retry(\d+)?", re.IGNORECASE)
-
+# One pass over a log collects ORA codes, ORA-39082 objects and the Data Pump
+# completion markers. The ORA-39082 detail sits in a lookahead so the rest of the
+# line is still scanned. Logs are scanned as raw bytes (Oracle output is ASCII).
 # ORA-39082 line example:
 # ORA-39082: Object type VIEW:"LEGACY_APP"."BAD_VIEW" created with compilation warnings
-ORA_39082_OBJ_RE = re.compile(
-    r'ORA-39082:\s+Object type\s+(\w+):"([^"]+)"\."([^"]+)"\s+created with compilation warnings',
+LOG_SCAN_RE = re.compile(
+    rb"\bORA-(?P<ora>\d{5})\b"
+    rb'(?:(?<=39082)(?=:\s+Object type\s+(?P<obj_type>\w+):"(?P<schema>[^"]+)"\."(?P<obj_name>[^"]+)"\s+created with compilation warnings))?'
+    rb"|(?P<dp_success>\bsuccessfully completed\b)"
+    rb"|(?P<dp_with_errors>\bcompleted with\s+(?:(?P<dp_error_count>\d+)\s+)?error)"
+    rb"|(?P<dp_completed>\bcompleted\b)",
     re.IGNORECASE,
 )
 
 # used for orders_count_proof parsing
-INTEGER_LINE_RE = re.compile(r"^\s*(\d{1,12})\s*$")
+INTEGER_LINE_RE = re.compile(r"^\s*(\d{1,12})\s*$", re.MULTILINE)
+
+# invalid_object_proof.txt data row whose 4th column is INVALID. SQL*Plus table
+# columns are separated by 2+ spaces, so a column is single-space-joined tokens;
+# any further columns are ignored. Header rows start with OWNER.
+_PROOF_COL = r"\S+(?:[^\S\n]\S+)*"
+INVALID_ROW_RE = re.compile(
+    rf"^[^\S\n]*(?!owner)(?P<owner>{_PROOF_COL})[^\S\n]{{2,}}(?P<object_name>{_PROOF_COL})"
+    rf"[^\S\n]{{2,}}(?P<object_type>{_PROOF_COL})[^\S\n]{{2,}}(?P<status>invalid)"
+    r"(?:[^\S\n]{2,}[^\n]*)?[^\S\n]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# the same boundaries str.splitlines() breaks on, as UTF-8 bytes
+LINE_BREAK_RE = re.compile(rb"\r\n|[\n\r\v\f\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
 
 # --------------------------
 # Severity taxonomy
@@ -111,7 +140,7 @@ RISK_WEIGHTS = {
 class LogResult:
     key_rel: str
     found: bool
-    text: str | None
+    raw: bytes | None
     ora_counts: dict[str, int]
     dp_state: str
     dp_error_count: int | None
@@ -147,19 +176,44 @@ def _derive_run_prefix(metrics_key: str) -> str:
     return metrics_key[: -len("00-metadata/metrics.json")]
 
 
-def _s3_get_text(bucket: str, key: str, max_bytes: int) -> str:
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    body = obj["Body"].read(max_bytes)
-    # utf-8-sig strips BOM if present
-    try:
-        return body.decode("utf-8-sig", errors="replace")
-    except Exception:
-        return body.decode("utf-8", errors="replace")
+def _s3_get_bytes(bucket: str, key: str, max_bytes: int, size: int | None = None, tail_bytes: int = 0) -> bytes:
+    """
+    Read at most max_bytes. With tail_bytes, an object larger than max_bytes is read
+    as its head plus its last tail_bytes (joined by a newline) instead of the head only.
+    """
+    oversized = size is not None and size > max_bytes
+    head_len = max_bytes - tail_bytes if oversized else max_bytes
+    # when a LIST already reported the size, ask S3 for only the bytes we will read
+    extra = {"Range": f"bytes=0-{head_len - 1}"} if oversized else {}
+    obj = s3.get_object(Bucket=bucket, Key=key, **extra)
+    body = obj["Body"]
+    if size is None and (obj.get("ContentLength") or 0) > max_bytes:
+        oversized = True
+        head_len = max_bytes - tail_bytes
 
+    # strip a UTF-8 BOM so it never lands in the first excerpt line
+    head = body.read(head_len).removeprefix(codecs.BOM_UTF8)
+    if not (oversized and tail_bytes):
+        return head
 
-def _s3_try_get_text(bucket: str, key: str, max_bytes: int) -> str | None:
+    body.close()
+    tail = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{tail_bytes}")["Body"].read()
+    return head + b"\n" + tail
+
+
+def _json_loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps_indented(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _s3_try_get_bytes(bucket: str, key: str, max_bytes: int, tail_bytes: int = 0) -> bytes | None:
     try:
-        return _s3_get_text(bucket, key, max_bytes=max_bytes)
+        return _s3_get_bytes(bucket, key, max_bytes=max_bytes, tail_bytes=tail_bytes)
     except ClientError as e:
         code = (e.response.get("Error") or {}).get("Code", "")
         if code in ("NoSuchKey", "404", "NotFound"):
@@ -167,78 +221,134 @@ def _s3_try_get_text(bucket: str, key: str, max_bytes: int) -> str | None:
         raise
 
 
+def _s3_try_get_text(bucket: str, key: str, max_bytes: int) -> str | None:
+    body = _s3_try_get_bytes(bucket, key, max_bytes)
+    return None if body is None else body.decode("utf-8", errors="replace")
+
+
 # --------------------------
 # Parsing helpers
 # --------------------------
 
-def _parse_ora_counts(text: str) -> dict[str, int]:
-    counts: dict[str, int] = {}
-    for code in ORA_RE.findall(text or ""):
-        cu = code.upper()
-        counts[cu] = counts.get(cu, 0) + 1
-    return counts
-
+def _iter_log_matches(data: bytes) -> Iterator[re.Match[bytes]]:
+    """Same matches as LOG_SCAN_RE.finditer(data), but the regex only runs where a match can start.
 
-def _dp_completion_state_and_errors(text: str) -> tuple[str, int | None]:
-    if DP_SUCCESS_RE.search(text or ""):
-        return "SUCCESS", 0
+    Every match begins at "ora-", at "completed", or at "successfully " right before
+    "completed" (case-insensitive), so those offsets are located with bytes.find
+    (memchr speed) and LOG_SCAN_RE.match is tried there only. Clean logs skip the
+    regex almost entirely.
+    """
+    lowered = data.lower()
+    find = lowered.find
+    starts: list[int] = []
+
+    i = find(b"ora-")
+    while i >= 0:
+        starts.append(i)
+        i = find(b"ora-", i + 4)
+
+    i = find(b"completed")
+    while i >= 0:
+        if i >= 13 and lowered.startswith(b"successfully ", i - 13):
+            starts.append(i - 13)
+        starts.append(i)
+        i = find(b"completed", i + 9)
+
+    if not starts:
+        return
+    starts.sort()
+
+    match = LOG_SCAN_RE.match
+    pos = 0
+    for start in starts:
+        if start < pos:
+            continue
+        m = match(data, start)
+        if m is not None:
+            pos = m.end()
+            yield m
 
-    m = DP_COMPLETED_WITH_ERRORS_RE.search(text or "")
-    if m:
-        try:
-            return "COMPLETED_WITH_ERRORS", int(m.group(1))
-        except Exception:
-            return "COMPLETED_WITH_ERRORS", None
 
-    if DP_COMPLETED_WITH_ERRORS_RE2.search(text or ""):
-        return "COMPLETED_WITH_ERRORS", None
+def _scan_log(data: bytes) -> tuple[dict[str, int], str, int | None, list[dict[str, str]]]:
+    """Return (ora_counts, dp_state, dp_error_count, ora_39082_findings) in one pass over the log."""
+    # keyed by the 5-digit suffix, which has no case to normalize
+    by_digits: defaultdict[bytes, int] = defaultdict(int)
+    compile_warnings: list[dict[str, str]] = []
+    success = with_errors = completed = False
+    error_count: int | None = None
+
+    for m in _iter_log_matches(data or b""):
+        digits = m["ora"]
+        if digits is not None:
+            by_digits[digits] += 1
+            if m["obj_type"] is not None:
+                compile_warnings.append({
+                    "ora": "ORA-39082",
+                    "object_type": m["obj_type"].upper().decode("ascii"),
+                    "schema": m["schema"].decode("utf-8", errors="replace"),
+                    "object_name": m["obj_name"].decode("utf-8", errors="replace"),
+                })
+        elif m["dp_success"] is not None:
+            success = True
+        elif m["dp_with_errors"] is not None:
+            with_errors = True
+            if error_count is None and m["dp_error_count"] is not None:
+                error_count = int(m["dp_error_count"])
+        else:
+            completed = True
 
-    if DP_COMPLETED_RE.search(text or ""):
-        return "COMPLETED", None
+    counts = {"ORA-" + d.decode("ascii"): n for d, n in by_digits.items()}
 
-    return "NONE", None
+    # marker precedence: success > "completed with N errors" > "completed with errors" > "completed"
+    if success:
+        return counts, "SUCCESS", 0, compile_warnings
+    if with_errors:
+        return counts, "COMPLETED_WITH_ERRORS", error_count, compile_warnings
+    if completed:
+        return counts, "COMPLETED", None, compile_warnings
+    return counts, "NONE", None, compile_warnings
 
 
 def _impdp_retry_number(filename: str) -> int:
-    m = IMPDP_RETRY_RE.search(filename or "")
-    if not m:
+    # "...retry<N>..." -> N, bare "retry" -> 1, no marker -> 0
+    s = (filename or "").lower()
+    i = s.find("retry")
+    if i < 0:
         return 0
-    if not m.group(1):
-        return 1
-    try:
-        return int(m.group(1))
-    except Exception:
-        return 1
+    j = k = i + 5
+    while k < len(s) and s[k].isdecimal():
+        k += 1
+    return int(s[j:k]) if k > j else 1
 
 
 def _analyze_log(bucket: str, run_prefix: str, rel_key: str) -> LogResult:
     abs_key = run_prefix + rel_key
-    text = _s3_try_get_text(bucket, abs_key, max_bytes=MAX_BYTES_LOG)
-    if text is None:
+    data = _s3_try_get_bytes(bucket, abs_key, max_bytes=MAX_BYTES_LOG, tail_bytes=LOG_TAIL_BYTES)
+    if data is None:
         return LogResult(rel_key, False, None, {}, "NONE", None)
 
-    dp_state, dp_errs = _dp_completion_state_and_errors(text)
-    return LogResult(rel_key, True, text, _parse_ora_counts(text), dp_state, dp_errs)
+    ora_counts, dp_state, dp_errs, _ = _scan_log(data)
+    return LogResult(rel_key, True, data, ora_counts, dp_state, dp_errs)
 
 
-def _pick_best_impdp_log(bucket: str, run_prefix: str) -> tuple[str | None, int, list[dict[str, Any]], str]:
-    prefix = run_prefix + MIGRATION_PREFIX_REL
-    resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix, MaxKeys=1000)
-    objs = resp.get("Contents") or []
+def _pick_best_impdp_log(bucket: str, run_prefix: str) -> tuple[dict[str, Any] | None, int, list[dict[str, Any]], str]:
+    # S3 applies the impdp_ filter; paginate so large migration folders aren't truncated at 1000 keys
+    prefix = run_prefix + MIGRATION_PREFIX_REL + "impdp_"
+    pages = s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix)
 
     candidates = []
-    for o in objs:
-        key = o.get("Key", "")
-        base = key.split("/")[-1]
-        if base.startswith("impdp_") and base.endswith(".log"):
-            rn = _impdp_retry_number(base)
-            candidates.append((o, rn))
+    for page in pages:
+        for o in page.get("Contents", ()):
+            base = o["Key"].rpartition("/")[2]
+            # nested keys under an impdp_* "folder" are not logs of this folder
+            if base.startswith("impdp_") and base.endswith(".log"):
+                candidates.append((o, base, _impdp_retry_number(base)))
 
     meta: list[dict[str, Any]] = []
-    for o, rn in candidates:
+    for o, base, rn in candidates:
         meta.append({
             "key": o["Key"].replace(run_prefix, ""),
-            "base_name": o["Key"].split("/")[-1],
+            "base_name": base,
             "retry_number": rn,
             "last_modified": o["LastModified"].isoformat() if hasattr(o["LastModified"], "isoformat") else str(o["LastModified"]),
             "size": o.get("Size"),
@@ -248,61 +358,62 @@ def _pick_best_impdp_log(bucket: str, run_prefix: str) -> tuple[str | None, int,
         return None, 0, meta, "no_candidates"
 
     # select by retry_number then LastModified
-    candidates.sort(key=lambda x: (x[1], x[0]["LastModified"]))
-    selected_obj, _selected_rn = candidates[-1]
+    candidates.sort(key=lambda x: (x[2], x[0]["LastModified"]))
+    selected_obj, _selected_base, _selected_rn = candidates[-1]
 
-    max_rn = max(rn for _, rn in candidates)
+    max_rn = max(rn for _, _, rn in candidates)
     selection_reason = "filename_retry_number_then_lastmodified" if max_rn > 0 else "lastmodified"
 
-    return selected_obj["Key"], len(candidates), meta, selection_reason
+    # the listing entry (Key, Size, ...) is returned so the caller can size its GET
+    return selected_obj, len(candidates), meta, selection_reason
 
 
-def _extract_excerpts(text: str, codes: list[str], context_lines: int = 2, max_total_lines: int = 20) -> dict[str, list[str]]:
+def _line_spans(data: bytes) -> tuple[list[int], list[int]]:
+    """Start/end offsets of each line, matching splitlines() of the decoded text without building the list."""
+    starts = [0]
+    ends: list[int] = []
+    for m in LINE_BREAK_RE.finditer(data):
+        ends.append(m.start())
+        starts.append(m.end())
+    if starts[-1] == len(data):
+        starts.pop()
+    else:
+        ends.append(len(data))
+    return starts, ends
+
+
+def _extract_excerpts(data: bytes, codes: list[str], context_lines: int = 2, max_total_lines: int = 20) -> dict[str, list[str]]:
     excerpts: dict[str, list[str]] = {}
-    if not text or not codes:
+    if not data or not codes:
         return excerpts
 
-    lines = (text or "").splitlines()
+    upper = data.upper()
+    starts, ends = _line_spans(data)
+    line_count = len(starts)
     used = 0
 
     for code in codes:
         code_u = code.upper()
-        hit_idx = None
-        for i, ln in enumerate(lines):
-            if code_u in ln.upper():
-                hit_idx = i
-                break
-        if hit_idx is None:
+        pos = upper.find(code_u.encode("ascii"))
+        if pos < 0:
             continue
+        hit_idx = bisect_right(starts, pos) - 1
 
         start = max(0, hit_idx - context_lines)
-        end = min(len(lines), hit_idx + context_lines + 1)
-        chunk = lines[start:end]
+        end = min(line_count, hit_idx + context_lines + 1)
 
         remaining = max_total_lines - used
         if remaining <= 0:
             break
-        if len(chunk) > remaining:
-            chunk = chunk[:remaining]
+        end = min(end, start + remaining)
 
-        excerpts[code_u] = chunk
-        used += len(chunk)
+        # only the excerpt lines are decoded
+        excerpts[code_u] = [data[starts[i]:ends[i]].decode("utf-8", errors="replace") for i in range(start, end)]
+        used += end - start
 
     return excerpts
 
 
-def _extract_compile_warnings_39082(text: str) -> list[dict[str, str]]:
-    findings: list[dict[str, str]] = []
-    for m in ORA_39082_OBJ_RE.finditer(text or ""):
-        findings.append({
-            "ora": "ORA-39082",
-            "object_type": m.group(1).upper(),
-            "schema": m.group(2),
-            "object_name": m.group(3),
-        })
-    return findings
-
-
 # --------------------------
 # Validation proof parsing (YOUR formats)
 # --------------------------
@@ -320,31 +431,9 @@ def _parse_invalid_object_proof(text: str) -> dict[str, Any]:
     if not text:
         return {"count": None, "objects": []}
 
-    objects: list[dict[str, str]] = []
-    count = 0
-
-    for ln in text.splitlines():
-        s = ln.strip()
-        if not s:
-            continue
-        # skip header/separator lines
-        if s.upper().startswith("OWNER") or set(s) <= set("- "):
-            continue
-
-        # split on 2+ spaces (SQL*Plus table style)
-        parts = re.split(r"\s{2,}", s)
-        if len(parts) >= 4:
-            owner, obj_name, obj_type, status = parts[0], parts[1], parts[2], parts[3]
-            if status.upper() == "INVALID":
-                count += 1
-                objects.append({
-                    "owner": owner,
-                    "object_name": obj_name,
-                    "object_type": obj_type,
-                    "status": status,
-                })
-
-    return {"count": count, "objects": objects}
+    # header/separator/VALID rows simply don't match
+    objects = [m.groupdict() for m in INVALID_ROW_RE.finditer(text)]
+    return {"count": len(objects), "objects": objects}
 
 
 def _parse_orders_count_proof(text: str) -> int | None:
@@ -360,20 +449,12 @@ def _parse_orders_count_proof(text: str) -> int | None:
     if not text:
         return None
 
-    for ln in text.splitlines():
-        m = INTEGER_LINE_RE.match(ln)
-        if m:
-            try:
-                return int(m.group(1))
-            except Exception:
-                return None
-    return None
-
+    # the multiline pattern only matches a line holding nothing but the integer
+    m = INTEGER_LINE_RE.search(text)
+    return int(m.group(1)) if m else None
 
-def _parse_validation(bucket: str, run_prefix: str) -> dict[str, Any]:
-    invalid_txt = _s3_try_get_text(bucket, run_prefix + INVALID_OBJECT_PROOF_REL, max_bytes=MAX_BYTES_PROOF)
-    orders_txt = _s3_try_get_text(bucket, run_prefix + ORDERS_COUNT_PROOF_REL, max_bytes=MAX_BYTES_PROOF)
 
+def _parse_validation(invalid_txt: str | None, orders_txt: str | None) -> dict[str, Any]:
     invalid_parsed = _parse_invalid_object_proof(invalid_txt or "")
     orders_count = _parse_orders_count_proof(orders_txt or "")
 
@@ -496,14 +577,14 @@ def _classify_status(expdp: LogResult | None, impdp: LogResult | None, validatio
 # --------------------------
 
 def _top_ora(ora_counts_by_file: dict[str, dict[str, int]], top_n: int = 10) -> list[tuple[str, int]]:
-    agg: dict[str, int] = {}
-    for _, counts in (ora_counts_by_file or {}).items():
-        for code, cnt in (counts or {}).items():
-            agg[code] = agg.get(code, 0) + int(cnt)
-    return sorted(agg.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    agg: Counter[str] = Counter()
+    for counts in (ora_counts_by_file or {}).values():
+        agg.update(counts or {})
+    # most_common keeps first-seen order among ties, same as the stable sort it replaces
+    return agg.most_common(top_n)
 
 
-def _render_executive_md(summary: dict) -> str:
+def _render_executive_md(summary: dict, ora_totals: Counter[str] | None = None) -> str:
     run = summary.get("run", {}) or {}
     inv = summary.get("artifact_inventory", {}) or {}
     derived = summary.get("derived", {}) or {}
@@ -512,94 +593,100 @@ def _render_executive_md(summary: dict) -> str:
     validation = summary.get("validation", {}) or {}
     compile_warnings = summary.get("compile_warnings", []) or []
 
-    top_ora = _top_ora(summary.get("ora_counts_by_file", {}) or {}, top_n=10)
-
-    lines: list[str] = []
-    lines.append("# Oracle Upgrade/Migration Executive Summary")
-    lines.append("")
-    lines.append("## Run Overview")
-    lines.append(f"- **Run ID:** `{run.get('run_id', '')}`")
-    lines.append(f"- **Run Prefix:** `{run.get('run_prefix', '')}`")
-    lines.append(f"- **Environment:** `{run.get('environment', '')}`")
-    lines.append(f"- **AWS Region:** `{run.get('aws_region', '')}`")
-    lines.append(f"- **S3 Bucket:** `{run.get('s3_bucket', '')}`")
-    lines.append(f"- **Created UTC:** `{run.get('created_utc', '')}`")
-    lines.append(f"- **Overall Status:** `{summary.get('overall_status', 'UNKNOWN')}`")
-    lines.append("")
-
-    lines.append("## Deterministic Risk Assessment")
-    lines.append(f"- **Risk score (0-100):** {risk.get('score')}")
-    lines.append(f"- **Risk level:** `{risk.get('level')}`")
+    # the handler passes the totals it accumulated while parsing; otherwise merge from the summary
+    if ora_totals is not None:
+        top_ora = ora_totals.most_common(10)
+    else:
+        top_ora = _top_ora(summary.get("ora_counts_by_file", {}) or {}, top_n=10)
+
+    exp = dp.get("export", {})
+    imp = dp.get("import", {})
+
+    out = io.StringIO()
+    w = out.write
+
+    w(
+        "# Oracle Upgrade/Migration Executive Summary\n"
+        "\n"
+        "## Run Overview\n"
+        f"- **Run ID:** `{run.get('run_id', '')}`\n"
+        f"- **Run Prefix:** `{run.get('run_prefix', '')}`\n"
+        f"- **Environment:** `{run.get('environment', '')}`\n"
+        f"- **AWS Region:** `{run.get('aws_region', '')}`\n"
+        f"- **S3 Bucket:** `{run.get('s3_bucket', '')}`\n"
+        f"- **Created UTC:** `{run.get('created_utc', '')}`\n"
+        f"- **Overall Status:** `{summary.get('overall_status', 'UNKNOWN')}`\n"
+        "\n"
+        "## Deterministic Risk Assessment\n"
+        f"- **Risk score (0-100):** {risk.get('score')}\n"
+        f"- **Risk level:** `{risk.get('level')}`\n"
+    )
     if risk.get("factors"):
-        lines.append("- **Top factors:**")
+        w("- **Top factors:**\n")
         for f in (risk.get("factors") or [])[:10]:
-            lines.append(f"  - `{f.get('factor')}` (+{f.get('weight')}): {f.get('evidence')}")
-    lines.append("")
-
-    lines.append("## Evidence Inventory (S3)")
-    lines.append(f"- **Object count:** {inv.get('object_count')}")
-    lines.append(f"- **Total bytes:** {inv.get('total_bytes')}")
-    lines.append(f"- **Selected IMPDP log (final attempt):** `{derived.get('selected_impdp_log')}`")
-    lines.append(f"- **Selection reason:** `{dp.get('selection_reason')}`")
-    lines.append("")
-
-    lines.append("## Data Pump Status (heuristic)")
-    lines.append(
-        f"- **Export log:** `{dp.get('export', {}).get('log')}` → `{dp.get('export', {}).get('status')}` "
-        f"(state={dp.get('export', {}).get('completion_state')}, errors={dp.get('export', {}).get('completed_with_error_count')})"
+            w(f"  - `{f.get('factor')}` (+{f.get('weight')}): {f.get('evidence')}\n")
+
+    w(
+        "\n"
+        "## Evidence Inventory (S3)\n"
+        f"- **Object count:** {inv.get('object_count')}\n"
+        f"- **Total bytes:** {inv.get('total_bytes')}\n"
+        f"- **Selected IMPDP log (final attempt):** `{derived.get('selected_impdp_log')}`\n"
+        f"- **Selection reason:** `{dp.get('selection_reason')}`\n"
+        "\n"
+        "## Data Pump Status (heuristic)\n"
+        f"- **Export log:** `{exp.get('log')}` → `{exp.get('status')}` "
+        f"(state={exp.get('completion_state')}, errors={exp.get('completed_with_error_count')})\n"
+        f"- **Import log:** `{imp.get('log')}` → `{imp.get('status')}` "
+        f"(state={imp.get('completion_state')}, attempts={imp.get('attempt_count')})\n"
+        "\n"
+        "## Validation (from proof artifacts)\n"
+        f"- **Validation status:** `{validation.get('status')}`\n"
+        f"- **Invalid objects (count):** {validation.get('invalid_objects_count')}\n"
+        f"- **Orders count proof:** {validation.get('orders_count')}\n"
     )
-    lines.append(
-        f"- **Import log:** `{dp.get('import', {}).get('log')}` → `{dp.get('import', {}).get('status')}` "
-        f"(state={dp.get('import', {}).get('completion_state')}, attempts={dp.get('import', {}).get('attempt_count')})"
-    )
-    lines.append("")
-
-    lines.append("## Validation (from proof artifacts)")
-    lines.append(f"- **Validation status:** `{validation.get('status')}`")
-    lines.append(f"- **Invalid objects (count):** {validation.get('invalid_objects_count')}")
-    lines.append(f"- **Orders count proof:** {validation.get('orders_count')}")
     if validation.get("invalid_objects_sample"):
-        lines.append("- **Invalid objects (sample):**")
+        w("- **Invalid objects (sample):**\n")
         for o in validation["invalid_objects_sample"][:10]:
-            lines.append(f"  - {o.get('owner')}.{o.get('object_name')} ({o.get('object_type')}) = {o.get('status')}")
-    lines.append("")
+            w(f"  - {o.get('owner')}.{o.get('object_name')} ({o.get('object_type')}) = {o.get('status')}\n")
 
-    lines.append("## Key Findings (ORA-* taxonomy)")
+    w("\n## Key Findings (ORA-* taxonomy)\n")
     if not top_ora:
-        lines.append("- No ORA-* patterns detected in parsed logs.")
+        w("- No ORA-* patterns detected in parsed logs.\n")
     else:
         for code, cnt in top_ora:
-            lines.append(f"- {code}: {cnt}")
-    lines.append("")
+            w(f"- {code}: {cnt}\n")
 
-    lines.append("## Compilation Warnings (ORA-39082)")
+    w("\n## Compilation Warnings (ORA-39082)\n")
     if not compile_warnings:
-        lines.append("- None detected.")
+        w("- None detected.\n")
     else:
         for item in compile_warnings[:20]:
-            lines.append(f"- {item.get('object_type')}: {item.get('schema')}.{item.get('object_name')}")
-    lines.append("")
+            w(f"- {item.get('object_type')}: {item.get('schema')}.{item.get('object_name')}\n")
+    w("\n")
 
     excerpts = summary.get("evidence_excerpts", {}) or {}
     if excerpts:
-        lines.append("## Evidence Excerpts (bounded)")
+        w("## Evidence Excerpts (bounded)\n")
         for src, by_code in excerpts.items():
-            lines.append(f"### {src}")
+            w(f"### {src}\n")
             for code, chunk in (by_code or {}).items():
-                lines.append(f"- **{code}**")
-                lines.append("```")
-                lines.extend(chunk)
-                lines.append("```")
-        lines.append("")
-
-    lines.append("## Governance / Guardrails")
+                w(f"- **{code}**\n```\n")
+                for ln in chunk:
+                    w(ln)
+                    w("\n")
+                w("```\n")
+        w("\n")
+
+    w("## Governance / Guardrails\n")
     for g in summary.get("guardrails", []) or []:
-        lines.append(f"- {g}")
-    lines.append("")
-    lines.append("---")
-    lines.append("**Note:** Generated from S3 artifacts only. No DB commands executed by AWS components.")
-    lines.append("")
-    return "\n".join(lines)
+        w(f"- {g}\n")
+    w(
+        "\n"
+        "---\n"
+        "**Note:** Generated from S3 artifacts only. No DB commands executed by AWS components.\n"
+    )
+    return out.getvalue()
 
 
 # --------------------------
@@ -617,24 +704,40 @@ def lambda_handler(event, context):
     print(f"trigger_key={key}")
     print(f"derived_run_prefix={run_prefix}")
 
-    metrics = json.loads(_s3_get_text(bucket, key, max_bytes=MAX_BYTES_METRICS))
+    # Every read is independent: fan out metrics, allowlisted logs, proofs and the
+    # migration LIST together, then fetch the selected impdp log as soon as LIST returns.
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as pool:
+        metrics_fut = pool.submit(_s3_get_bytes, bucket, key, MAX_BYTES_METRICS)
+        log_futs = [pool.submit(_analyze_log, bucket, run_prefix, rel) for rel in ALLOWLIST_RELATIVE_KEYS]
+        invalid_proof_fut = pool.submit(_s3_try_get_text, bucket, run_prefix + INVALID_OBJECT_PROOF_REL, MAX_BYTES_PROOF)
+        orders_proof_fut = pool.submit(_s3_try_get_text, bucket, run_prefix + ORDERS_COUNT_PROOF_REL, MAX_BYTES_PROOF)
+        pick_fut = pool.submit(_pick_best_impdp_log, bucket, run_prefix)
+
+        # select final impdp
+        selected_impdp_obj, impdp_log_count, impdp_candidates, selection_reason = pick_fut.result()
+        selected_impdp_abs = selected_impdp_obj["Key"] if selected_impdp_obj else None
+        impdp_data_fut = (
+            pool.submit(_s3_get_bytes, bucket, selected_impdp_abs, MAX_BYTES_LOG, selected_impdp_obj.get("Size"), LOG_TAIL_BYTES)
+            if selected_impdp_obj else None
+        )
+
+    metrics = _json_loads(metrics_fut.result())
 
     # allowlisted logs
     log_results: list[LogResult] = []
     log_presence: dict[str, Any] = {}
     ora_counts_by_file: dict[str, dict[str, int]] = {}
+    ora_totals: Counter[str] = Counter()
 
-    for rel in ALLOWLIST_RELATIVE_KEYS:
-        lr = _analyze_log(bucket, run_prefix, rel)
+    for fut in log_futs:
+        lr = fut.result()
         log_results.append(lr)
-        log_presence[rel] = lr.found
-        ora_counts_by_file[rel] = lr.ora_counts
+        log_presence[lr.key_rel] = lr.found
+        ora_counts_by_file[lr.key_rel] = lr.ora_counts
+        ora_totals.update(lr.ora_counts)
 
     expdp_lr = next((x for x in log_results if x.key_rel.endswith("expdp_legacy_18c.log")), None)
 
-    # select final impdp
-    selected_impdp_abs, impdp_log_count, impdp_candidates, selection_reason = _pick_best_impdp_log(bucket, run_prefix)
-
     impdp_lr: LogResult | None = None
     selected_impdp_rel: str | None = None
     evidence_excerpts: dict[str, dict[str, list[str]]] = {}
@@ -642,25 +745,24 @@ def lambda_handler(event, context):
 
     if selected_impdp_abs:
         selected_impdp_rel = selected_impdp_abs.replace(run_prefix, "")
-        impdp_text = _s3_get_text(bucket, selected_impdp_abs, max_bytes=MAX_BYTES_LOG)
-        dp_state, dp_errs = _dp_completion_state_and_errors(impdp_text)
-        impdp_lr = LogResult(selected_impdp_rel, True, impdp_text, _parse_ora_counts(impdp_text), dp_state, dp_errs)
+        impdp_data = impdp_data_fut.result()
+        impdp_counts, dp_state, dp_errs, compile_warnings = _scan_log(impdp_data)
+        impdp_lr = LogResult(selected_impdp_rel, True, impdp_data, impdp_counts, dp_state, dp_errs)
 
         log_presence[selected_impdp_rel] = True
         ora_counts_by_file[selected_impdp_rel] = impdp_lr.ora_counts
+        ora_totals.update(impdp_lr.ora_counts)
 
         fatal_in_impdp = sorted([c for c in impdp_lr.ora_counts.keys() if c in FATAL_ORA])
         if fatal_in_impdp:
-            evidence_excerpts[selected_impdp_rel] = _extract_excerpts(impdp_text, fatal_in_impdp)
-
-        compile_warnings = _extract_compile_warnings_39082(impdp_text)
+            evidence_excerpts[selected_impdp_rel] = _extract_excerpts(impdp_data, fatal_in_impdp)
 
         print(f"selected_impdp_log={selected_impdp_abs} selection_reason={selection_reason}")
     else:
         print("selected_impdp_log=None")
 
     # validation (proof parsing)
-    validation = _parse_validation(bucket, run_prefix)
+    validation = _parse_validation(invalid_proof_fut.result(), orders_proof_fut.result())
 
     # status + risk
     overall_status, status_reasons = _classify_status(expdp_lr, impdp_lr, validation, impdp_log_count)
@@ -719,21 +821,30 @@ def lambda_handler(event, context):
 
     # write sanitized summary
     summary_key = run_prefix + "00-metadata/sanitized_summary.json"
-    s3.put_object(
-        Bucket=bucket,
-        Key=summary_key,
-        Body=(json.dumps(summary, indent=2)).encode("utf-8"),
-        ContentType="application/json",
-    )
-
-    # write executive report
     report_key = run_prefix + "05-reports/executive_report.md"
-    s3.put_object(
-        Bucket=bucket,
-        Key=report_key,
-        Body=_render_executive_md(summary).encode("utf-8"),
-        ContentType="text/markdown",
-    )
+    summary_body = _json_dumps_indented(summary)
+    report_body = _render_executive_md(summary, ora_totals).encode("utf-8")
+
+    # the two PUTs are independent; issue them together and surface either failure
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        put_futs = [
+            pool.submit(
+                s3.put_object,
+                Bucket=bucket,
+                Key=summary_key,
+                Body=summary_body,
+                ContentType="application/json",
+            ),
+            pool.submit(
+                s3.put_object,
+                Bucket=bucket,
+                Key=report_key,
+                Body=report_body,
+                ContentType="text/markdown",
+            ),
+        ]
+    for fut in put_futs:
+        fut.result()
 
     print(f"wrote_sanitized_summary={summary_key}")
     print(f"wrote_executive_report={report_key}")
@@ -1,9 +1,13 @@
 ﻿import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 
 s3 = boto3.client("s3")
 
+# Any "## heading" section, body up to the next "## " or end of document
+SECTION_RE = re.compile(r"(?ms)^\s*##\s+(?P<heading>[^\s#][^\n]*?)\s*\r?\n(?P<body>.*?)(?=^\s*##\s|\Z)")
+
 def get_text(bucket: str, key: str, max_bytes: int = 800_000) -> str:
     obj = s3.get_object(Bucket=bucket, Key=key)
     data = obj["Body"].read(max_bytes)
@@ -17,13 +21,14 @@ def put_text(bucket: str, key: str, text: str):
         ContentType="text/markdown"
     )
 
-def extract_section(md: str, heading: str):
-    pattern = rf"(?ms)^\s*##\s+{re.escape(heading)}\s*\r?\n(.*?)(?=^\s*##\s|\Z)"
-    m = re.search(pattern, md)
-    if not m:
-        return None
-    body = m.group(1).rstrip()
-    return f"## {heading}\n{body}\n"
+def extract_sections(md: str, headings) -> dict:
+    # one pass over the report; the first section per heading wins
+    found = {}
+    for m in SECTION_RE.finditer(md):
+        heading = m.group("heading")
+        if heading in headings and heading not in found:
+            found[heading] = f"## {heading}\n{m.group('body').rstrip()}\n"
+    return found
 
 def handler(event, context):
     bucket = event.get("bucket") or os.environ.get("BUCKET_NAME")
@@ -32,18 +37,22 @@ def handler(event, context):
 
     md = get_text(bucket, exec_key)
 
-    validation = extract_section(md, "Validation (from proof artifacts)")
-    ora39082 = extract_section(md, "Compilation Warnings (ORA-39082)")
+    sections = extract_sections(md, {"Validation (from proof artifacts)", "Compilation Warnings (ORA-39082)"})
+    validation = sections.get("Validation (from proof artifacts)")
+    ora39082 = sections.get("Compilation Warnings (ORA-39082)")
 
     out_prefix = f"{run_prefix}/07-genai/sections"
-    wrote = []
+    writes = []
 
     if validation:
-        put_text(bucket, f"{out_prefix}/validation.md", validation)
-        wrote.append(f"{out_prefix}/validation.md")
+        writes.append((f"{out_prefix}/validation.md", validation))
 
     if ora39082:
-        put_text(bucket, f"{out_prefix}/ora39082.md", ora39082)
-        wrote.append(f"{out_prefix}/ora39082.md")
+        writes.append((f"{out_prefix}/ora39082.md", ora39082))
+
+    # independent objects: PUT them side by side; list() re-raises any failure
+    if writes:
+        with ThreadPoolExecutor(max_workers=len(writes)) as ex:
+            list(ex.map(lambda kv: put_text(bucket, kv[0], kv[1]), writes))
 
-    return {"ok": True, "wrote": wrote}
+    return {"ok": True, "wrote": [key for key, _ in writes]}
@@ -1,36 +1,203 @@
-﻿import json
+﻿import functools
+import gc
+import hashlib
+import json
+import logging
 import os
+import random
+import socket
+import time
 from urllib.parse import unquote_plus
-import boto3
+import botocore.session
+import urllib3
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.exceptions import ClientError
+# No tracing SDKs at module level (see ruff.toml): gate them inside handler
 
-sfn = boto3.client("stepfunctions")
+try:
+    import orjson
+except ImportError:  # orjson is optional; the json template below covers its absence
+    orjson = None
 
-def parse_input(event: dict) -> tuple[str, str, str | None]:
-    # S3 notification event
-    if isinstance(event, dict) and event.get("Records"):
-        rec = event["Records"][0]
-        bucket = rec["s3"]["bucket"]["name"]
-        key = unquote_plus(rec["s3"]["object"]["key"])
-        return bucket, key, None
+# Fixed for the life of the execution environment; a missing ARN fails at init
+SM_ARN = os.environ["STATE_MACHINE_ARN"]
+DEFAULT_MODEL_ID = os.environ.get("DEFAULT_MODEL_ID")
 
-    # Manual invoke: { "bucket": "...", "key": "...", "model_id": "..." }
-    if isinstance(event, dict) and event.get("bucket") and event.get("key"):
-        return event["bucket"], event["key"], event.get("model_id")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
-    raise ValueError("Unsupported event shape. Provide S3 event or {bucket,key,model_id?}.")
+# Step Functions is plain JSON 1.0 over HTTPS. Signing the request ourselves skips
+# loading the service model and building a client; the session only supplies
+# credentials (cached after the first lookup).
+_session = botocore.session.get_session()
 
-def handler(event, context):
-    sm_arn = os.environ["STATE_MACHINE_ARN"]
-    default_model_id = os.environ.get("DEFAULT_MODEL_ID")
+# arn:aws:states:<region>:<account>:stateMachine:<name>
+REGION = SM_ARN.split(":")[3]
+SFN_HOST = f"states.{REGION}.amazonaws.com"
+SFN_ENDPOINT = f"https://{SFN_HOST}/"
+# Execution ARNs are the state machine ARN with the resource type swapped, plus the name
+_EXECUTION_ARN_PREFIX = SM_ARN.replace(":stateMachine:", ":execution:", 1) + ":"
+
+# Everything but the body, date and signature is fixed per operation
+_OPERATION_HEADERS = {
+    target: {
+        "Content-Type": "application/x-amz-json-1.0",
+        "X-Amz-Target": f"AWSStepFunctions.{target}",
+    }
+    for target in ("StartExecution", "DescribeStateMachine")
+}
+_signer = SigV4Auth(_session.get_credentials(), "states", REGION)
+
+# A single keep-alive connection survives across warm invokes. The pool itself
+# retries only connection failures; throttling, 5xx and read errors on
+# StartExecution are retried with backoff in _start_execution_call.
+_http = urllib3.HTTPSConnectionPool(
+    SFN_HOST,
+    port=443,
+    maxsize=1,
+    block=False,
+    timeout=urllib3.Timeout(connect=2, read=5),
+    retries=urllib3.Retry(total=1, read=0, redirect=0, status=0),
+    socket_options=urllib3.connection.HTTPConnection.default_socket_options
+    + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+)
+
+def _dumps(data: dict) -> bytes:
+    return orjson.dumps(data) if orjson is not None else json.dumps(data).encode("utf-8")
+
+def _sfn_call(target: str, payload: dict, **urlopen_kw) -> dict:
+    body = _dumps(payload)
+    # AWSRequest copies the template headers, so signing never mutates them
+    req = AWSRequest(method="POST", url=SFN_ENDPOINT, data=body, headers=_OPERATION_HEADERS[target])
+    _signer.add_auth(req)
+
+    headers = dict(req.headers.items())
+    # Lambda sets this per invoke under active tracing; it is not part of the signature
+    trace_id = os.environ.get("_X_AMZN_TRACE_ID")
+    if trace_id:
+        headers["X-Amzn-Trace-Id"] = trace_id
+
+    resp = _http.urlopen("POST", "/", body=body, headers=headers, **urlopen_kw)
+    try:
+        data = json.loads(resp.data) if resp.data else {}
+    except ValueError:
+        # e.g. an HTML 5xx from a proxy or a truncated body; the status still decides
+        data = {}
+    if resp.status >= 400:
+        # same error surface callers would get from a botocore client
+        code = str(data.get("__type", resp.status)).rpartition("#")[2]
+        message = data.get("message") or data.get("Message", "")
+        raise ClientError(
+            {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": resp.status}},
+            target,
+        )
+    return data
+
+# Roughly botocore's standard retry mode, which the service client gave us for free
+_MAX_ATTEMPTS = 3
+_THROTTLING_CODES = frozenset(
+    ("ThrottlingException", "Throttling", "TooManyRequestsException", "RequestLimitExceeded")
+)
+
+def _start_execution_call(payload: dict, idempotent: bool) -> dict:
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        try:
+            return _sfn_call("StartExecution", payload)
+        except ClientError as e:
+            retryable = (
+                e.response["ResponseMetadata"]["HTTPStatusCode"] >= 500
+                or e.response["Error"]["Code"] in _THROTTLING_CODES
+            )
+            if not retryable or attempt == _MAX_ATTEMPTS:
+                raise
+        except urllib3.exceptions.HTTPError:
+            # A read failure (e.g. a stale keep-alive socket) may have reached the
+            # service; only a named start is safe to send again
+            if not idempotent or attempt == _MAX_ATTEMPTS:
+                raise
+        # exponential backoff with full jitter
+        time.sleep(random.uniform(0, 0.1 * 2**attempt))
+
+def _warm_up() -> None:
+    # The first request resolves credentials, loads the signer and opens TLS.
+    # Paying that during init keeps it off the first invoke. It is only an
+    # optimization, so it gets a tight budget and no retry rather than the pool's
+    # defaults, which could eat most of Lambda's init window.
+    try:
+        _sfn_call("DescribeStateMachine", {"stateMachineArn": SM_ARN}, timeout=urllib3.Timeout(total=1), retries=False)
+    except Exception as e:
+        # a bad STATE_MACHINE_ARN or missing permission shows up here first
+        logger.warning("warm-up DescribeStateMachine failed: %r", e)
 
-    bucket, key, model_id = parse_input(event)
-    model_id = model_id or default_model_id
+_warm_up()
 
+def _start_execution(bucket: str, key: str, model_id: str | None, name: str | None = None) -> dict:
+    # Built once: serialized for StartExecution below and returned as-is. Log
+    # input_json rather than re-dumping this dict.
     inp = {"bucket": bucket, "key": key, "model_id": model_id}
 
-    resp = sfn.start_execution(
-        stateMachineArn=sm_arn,
-        input=json.dumps(inp)
-    )
+    if orjson is not None:
+        # StartExecution wants str, orjson produces bytes
+        input_json = orjson.dumps(inp).decode("utf-8")
+    else:
+        # Fixed 3-key shape: only the values need JSON escaping
+        input_json = '{{"bucket":{},"key":{},"model_id":{}}}'.format(
+            json.dumps(bucket), json.dumps(key), json.dumps(model_id)
+        )
+
+    payload = {"stateMachineArn": SM_ARN, "input": input_json}
+    if name is not None:
+        payload["name"] = name
+    try:
+        # A repeated name with identical input returns the existing execution
+        resp = _start_execution_call(payload, idempotent=name is not None)
+    except ClientError as e:
+        # Same name, different input (e.g. DEFAULT_MODEL_ID changed between
+        # deliveries): the event was already handled, so report that execution
+        if name is None or e.response["Error"]["Code"] != "ExecutionAlreadyExists":
+            raise
+        return {"ok": True, "executionArn": _EXECUTION_ARN_PREFIX + name, "input": inp}
 
     return {"ok": True, "executionArn": resp["executionArn"], "input": inp}
+
+# S3 delivers notifications at least once, and a duplicate usually reaches the
+# same warm sandbox soon after; answer those from memory instead of Step Functions.
+# Failed starts raise, so they are never cached. Only the ARN string is kept;
+# each hit gets its own response dict, so no caller can alter a cached result.
+@functools.lru_cache(maxsize=64)
+def _start_named_execution_arn(bucket: str, key: str, model_id: str | None, name: str) -> str:
+    return _start_execution(bucket, key, model_id, name)["executionArn"]
+
+def _handle_s3_event(bucket: str, raw_key: str, sequencer: str | None) -> dict:
+    # only '%' escapes and '+' change under unquote_plus; plain keys pass through
+    key = unquote_plus(raw_key) if ("%" in raw_key or "+" in raw_key) else raw_key
+    # The sequencer differs for every write to a key, so redelivery of one
+    # notification maps to one execution name while a re-upload gets a new one.
+    # Without it, repeated uploads would collide, so leave the name to Step Functions.
+    # S3 notifications never carry a model id
+    if not sequencer:
+        return _start_execution(bucket, key, DEFAULT_MODEL_ID)
+    name = hashlib.blake2b(f"{bucket}/{key}/{sequencer}".encode("utf-8"), digest_size=16).hexdigest()
+    arn = _start_named_execution_arn(bucket, key, DEFAULT_MODEL_ID, name)
+    return {"ok": True, "executionArn": arn, "input": {"bucket": bucket, "key": key, "model_id": DEFAULT_MODEL_ID}}
+
+def _handle_manual(bucket: str, key: str, model_id: str | None) -> dict:
+    return _start_execution(bucket, key, model_id or DEFAULT_MODEL_ID)
+
+def handler(event, context):
+    match event:
+        # S3 notification event (the common path)
+        case {"Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": raw_key} as obj}}, *_]}:
+            return _handle_s3_event(bucket, raw_key, obj.get("sequencer"))
+
+        # Manual invoke: { "bucket": "...", "key": "...", "model_id": "..." }
+        case {"bucket": bucket, "key": key} if bucket and key:
+            return _handle_manual(bucket, key, event.get("model_id"))
+
+    raise ValueError("Unsupported event shape. Provide S3 event or {bucket,key,model_id?}.")
+
+# Nearly all tracked objects are botocore/urllib3 state built during init and
+# kept for the life of the sandbox. Freezing them means a full collection
+# triggered during an invoke no longer walks them.
+gc.freeze()